@@ -25,7 +25,7 @@ ar r librawdtb.a dtb_obj.o
 mv librawdtb.a ../../../Kernel/ARTIFACTS/
 mv x86_64_fdt.dtb ../../../Kernel/ARTIFACTS/
 
-cp Artifacts/* ../../../Kernel/ARTIFACTS/
+cp -p Artifacts/* ../../../Kernel/ARTIFACTS/
 rm dtb_obj.o dtb_obj.s
 
 echo -e "\e[1m\e[92m\nUpdated ARTIFACTS\e[22m\e[39m"
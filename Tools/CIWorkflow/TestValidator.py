@@ -1,8 +1,18 @@
+import concurrent.futures
+import contextlib
+import io
 import json
+import multiprocessing
 import sys
 import os
+import pickle
+import queue
 import re
+import shutil
+import signal
 import subprocess
+import tempfile
+import threading
 import time
 
 class COLORS:
@@ -16,7 +26,28 @@ class COLORS:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
-TYPE_STR = [
+BLUE_BOLD = COLORS.OKBLUE + COLORS.BOLD
+CYAN_BOLD = COLORS.OKCYAN + COLORS.BOLD
+
+FRAMEWORK_BANNER = BLUE_BOLD + "#==============================================================================#" + COLORS.ENDC + "\n" + \
+                   BLUE_BOLD + "| roOs UNIT TEST FRAMEWORK                                                     |" + COLORS.ENDC + "\n" + \
+                   BLUE_BOLD + "#==============================================================================#" + COLORS.ENDC
+REPORT_BANNER    = BLUE_BOLD + "\n\n#==============================================================================#" + COLORS.ENDC + "\n" + \
+                   BLUE_BOLD + "| FINAL REPORT                                                                 |" + COLORS.ENDC + "\n" + \
+                   BLUE_BOLD + "#==============================================================================#" + COLORS.ENDC
+REPORT_SEPARATOR = BLUE_BOLD + "#==============================================================================#" + COLORS.ENDC
+GROUP_START      = COLORS.OKBLUE + "\n#==============================================================================#" + COLORS.ENDC
+GROUP_END        = COLORS.OKBLUE + "#==============================================================================#\n" + COLORS.ENDC
+
+SUITE_BANNER       = CYAN_BOLD + "#--------------------------------------------------#" + COLORS.ENDC + "\n" + \
+                     CYAN_BOLD + "| roOs Test Suite                                  |" + COLORS.ENDC + "\n" + \
+                     CYAN_BOLD + "#--------------------------------------------------#" + COLORS.ENDC
+SUITE_COUNT_BANNER = COLORS.OKCYAN + "#--------------------------------------------------#" + COLORS.ENDC + "\n" + \
+                     COLORS.OKCYAN + "| N# of tests    | N# of success  | N# of failures |" + COLORS.ENDC + "\n" + \
+                     COLORS.OKCYAN + "|--------------------------------------------------#" + COLORS.ENDC
+SUITE_SEPARATOR    = COLORS.OKCYAN + "#--------------------------------------------------#" + COLORS.ENDC
+
+TYPE_STR = (
     "BYTE",
     "UBYTE",
     "HALF",
@@ -29,40 +60,54 @@ TYPE_STR = [
     "DOUBLE",
     "RCODE",
     "POINTER"
-]
+)
 
 TARGET_LIST = [
     "x86_64",
     "x86_i386"
 ]
 
-TEST_TIMEOUT = 120
+TEST_TIMEOUT  = 120
+BUILD_TIMEOUT = 600
+POLL_PERIOD   = 1
+
+DEVNULL = subprocess.DEVNULL
+
+FORCE_CLEAN = os.environ.get("FORCE_CLEAN") == "1"
+
+# Build outputs not copied to the work trees, and the GRUB modules used to
+# build the test image, relative to the sources directory
+BUILD_OUTPUTS    = ("build", "bin", "ARTIFACTS", "build_stage*", "*.cache.pkl")
+GRUB_MODULES_DIR = os.path.join("..", "Tools", "i386-pc")
+
+# Staged kernels: one being tested, one queued and one being staged
+STAGE_COUNT = 3
+
+FLAG_PATTERN    = re.compile(r"TEST_(.*?)_ENABLED")
+NAME_PATTERN    = re.compile(r"TEST_FRAMEWORK_TEST_NAME")
+SECTION_PATTERN = re.compile(r" \* TESTING ENABLE FLAGS")
 
 def Validate(jsonTestsuite):
-    print(COLORS.OKCYAN + COLORS.BOLD + "#--------------------------------------------------#" + COLORS.ENDC)
-    print(COLORS.OKCYAN + COLORS.BOLD + "| roOs Test Suite                                  |" + COLORS.ENDC)
-    print(COLORS.OKCYAN + COLORS.BOLD + "#--------------------------------------------------#" + COLORS.ENDC)
+    print(SUITE_BANNER)
     print(COLORS.OKCYAN +"| Version: {:40s}|".format(jsonTestsuite["version"]) + COLORS.ENDC)
     print(COLORS.OKCYAN +"| Testname: {:39s}|".format(jsonTestsuite["name"]) + COLORS.ENDC)
-    print(COLORS.OKCYAN +"#--------------------------------------------------#" + COLORS.ENDC)
-    print(COLORS.OKCYAN +"| N# of tests    | N# of success  | N# of failures |" + COLORS.ENDC)
-    print(COLORS.OKCYAN +"|--------------------------------------------------#" + COLORS.ENDC)
+    print(SUITE_COUNT_BANNER)
     print(COLORS.OKCYAN +"| {:14d} | {:14d} | {:14d} |".format(jsonTestsuite["number_of_tests"], jsonTestsuite["success"], jsonTestsuite["failures"]) + COLORS.ENDC)
-    print(COLORS.OKCYAN +"#--------------------------------------------------#" + COLORS.ENDC)
+    print(SUITE_SEPARATOR)
 
-    outComeStr = ""
-
-    testIdDict = {}
+    outComeStr  = ""
+    outputLines = []
 
     for testId, testContent in jsonTestsuite["test_suite"].items():
-        testIdDict[testId] = 1
         if testContent["status"] == 0:
             outComeStr = COLORS.FAIL + COLORS.BOLD + "FAIL" + COLORS.ENDC
-            print("===> Test {}".format(testId))
-            print("    > Outcome: {} | Expected: 0x{:X} -- Result: 0x{:X} | Type: {}".format(outComeStr, testContent["expected"], testContent["result"], TYPE_STR[testContent["type"]]))
+            outputLines.append(f"===> Test {testId}\n")
+            outputLines.append(f"    > Outcome: {outComeStr} | Expected: 0x{testContent['expected']:X} -- Result: 0x{testContent['result']:X} | Type: {TYPE_STR[testContent['type']]}\n")
         #else:
         #    outComeStr = COLORS.OKGREEN + COLORS.BOLD + "PASS" + COLORS.ENDC
 
+    # Only failures are reported, written at once
+    sys.stdout.write("".join(outputLines))
 
     print()
     if jsonTestsuite["failures"] == 0:
@@ -88,60 +133,81 @@ def DictRaiseDuplicate(ordPairs):
 
 def ParseInputFile(filename):
     isTestsuiteContent = False
-    with open(filename, 'r', errors='ignore') as fileDesc:
-        fileContent = fileDesc.readlines()
-        jsonBody = ""
-        for line in fileContent:
-            line = line.strip("\n")
-            if line == "#-------- TESTING SECTION START --------#":
+    jsonBody           = []
+    with open(filename, 'r', errors='ignore', buffering=1 << 20) as fileDesc:
+        for line in fileDesc:
+            marker = line.rstrip("\n")
+            if marker == "#-------- TESTING SECTION START --------#":
                 isTestsuiteContent = True
-            elif line == "#-------- TESTING SECTION END --------#":
-                isTestsuiteContent = False
-            else:
-                if isTestsuiteContent:
-                    jsonBody += line + "\n"
-
-        if len(jsonBody) == 0:
-            return ""
-
-        jsonObject = json.loads(jsonBody, object_pairs_hook=DictRaiseDuplicate)
-
-        return jsonObject
+            elif marker == "#-------- TESTING SECTION END --------#":
+                break
+            elif isTestsuiteContent:
+                jsonBody.append(line)
+
+    if len(jsonBody) == 0:
+        return ""
+
+    return json.loads("".join(jsonBody), object_pairs_hook=DictRaiseDuplicate)
+
+def LoadGroupsCached(filename):
+    # The parsed groups are pickled next to the groups file, the cache is
+    # valid as long as the groups file was not modified. Any error while
+    # loading the cache falls back to the JSON file.
+    fileStat  = os.stat(filename)
+    key       = (filename, fileStat.st_mtime_ns, fileStat.st_size)
+    cacheName = filename + ".cache.pkl"
+    try:
+        with open(cacheName, "rb") as cacheFile:
+            cacheKey, jsonObject = pickle.load(cacheFile)
+        if cacheKey == key:
+            return jsonObject
+    except Exception:
+        pass
+
+    with open(filename, "rb", buffering=1 << 20) as groupFile:
+        jsonObject = json.load(groupFile)
+
+    try:
+        with open(cacheName, "wb") as cacheFile:
+            pickle.dump((key, jsonObject), cacheFile)
+    except OSError:
+        pass
+
+    return jsonObject
 
 def UpdateTestFile(filename, testGroup, testName):
     with open(filename, "r+") as fileDesc:
         fileContent   = fileDesc.readlines()
-        startPosition = -1
-        nameFound     = False
+        startPosition   = -1
+        sectionPosition = -1
+        nameFound       = False
+        flagMap         = {}
 
-        # Find the lines to remove and the line where to start adding flags
-        pattern = re.compile("TEST_(.*?)_ENABLED")
-        namePattern = re.compile("TEST_FRAMEWORK_TEST_NAME")
+        # Disable all flags, keeping their position, and find the line where
+        # to start adding flags
         for i in range(0, len(fileContent)):
             if not nameFound:
-                result = namePattern.search(fileContent[i])
+                result = NAME_PATTERN.search(fileContent[i])
                 if result != None:
                     nameFound = True
                     fileContent[i] = "#define TEST_FRAMEWORK_TEST_NAME \"{}\"\n".format(testName)
                     continue
 
-            result = pattern.search(fileContent[i])
+            result = FLAG_PATTERN.search(fileContent[i])
 
             if result != None:
                 # Disable the flag
                 newLine = "#define {}".format(result.group(0))
                 fileContent[i] = newLine + " " * (50 - len(newLine)) + "0\n"
+                flagMap.setdefault(result.group(1), i)
                 if startPosition == -1:
                     startPosition = i
+            elif SECTION_PATTERN.search(fileContent[i]) != None:
+                sectionPosition = i + 2
 
-        # If no start position was found, search for the constants section
+        # If no start position was found, use the constants section
         if startPosition == -1:
-            pattern = re.compile(" \* TESTING ENABLE FLAGS")
-            for i in range(0, len(fileContent)):
-                result = pattern.search(fileContent[i])
-
-                if result != None:
-                    startPosition = i + 2
+            startPosition = sectionPosition
 
         # If still no start position found, return error
         if startPosition == -1:
@@ -149,32 +215,214 @@ def UpdateTestFile(filename, testGroup, testName):
             exit(-1)
 
         # Add or enable flags based on groups
-        found = False
-        pattern = re.compile("TEST_{}_ENABLED".format(testGroup))
         newLine = "#define TEST_{}_ENABLED".format(testGroup)
         newLine = newLine + " " * (50 - len(newLine)) + "1\n"
-        for i in range(startPosition, len(fileContent)):
-            result = pattern.search(fileContent[i])
-            if result != None:
-                fileContent[i] = newLine
-                found = True
-                break
-        if not found:
+        if testGroup in flagMap:
+            fileContent[flagMap[testGroup]] = newLine
+        else:
             fileContent.insert(startPosition + 1, newLine)
 
         # Save file
         fileDesc.seek(0)
         fileDesc.truncate(0)
-        for line in fileContent:
-            fileDesc.write(line)
+        fileDesc.write("".join(fileContent))
 
         print("> Updated Test List file")
 
 
+def KillProcessGroup(process):
+    # Kill the sub-makes, compilers and qemu along with the top make
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.communicate()
+
+def RunMake(command, workdir, isStopped):
+    process  = subprocess.Popen(command, cwd=workdir, stdout=DEVNULL, stderr=subprocess.PIPE, start_new_session=True)
+    deadline = time.time() + BUILD_TIMEOUT
+    try:
+        while True:
+            try:
+                _, stderr = process.communicate(timeout=POLL_PERIOD)
+                break
+            except subprocess.TimeoutExpired:
+                if isStopped():
+                    KillProcessGroup(process)
+                    print("Error: {} stopped".format(" ".join(command)))
+                    return False
+                if time.time() >= deadline:
+                    KillProcessGroup(process)
+                    print("Error: {} timed out after {}s".format(" ".join(command), BUILD_TIMEOUT))
+                    return False
+    except BaseException:
+        # make is not in our process group, Ctrl-C does not reach it
+        KillProcessGroup(process)
+        raise
+    if process.returncode != 0:
+        print("Error: {} failed with code {}".format(" ".join(command), process.returncode))
+        print(stderr.decode(errors="ignore"), end="")
+        return False
+    return True
+
+def BuildGroup(group, workdir, target, testListFileName, stageDir, isClean, isStopped):
+    print(GROUP_START)
+    print(COLORS.OKBLUE + " > Executing Group {}".format(group["name"])  + COLORS.ENDC)
+    print(COLORS.OKBLUE + " > " + str(group["testname"])  + COLORS.ENDC)
+    print(COLORS.OKBLUE + " > Target {}".format(target) + COLORS.ENDC)
+    print(GROUP_END)
+
+    # Update test file
+    UpdateTestFile(os.path.join(workdir, testListFileName), group["testname"], group["name"])
+
+    # The test list header is the only file changing between groups, make
+    # dependency tracking rebuilds what includes it. make does not track the
+    # build flags nor the target, the first group of a work tree is cleaned.
+    if (isClean or FORCE_CLEAN) and not RunMake(["make", "clean", "TESTS=TRUE"], workdir, isStopped):
+        return False
+
+    if not RunMake(["make", "target={}".format(target), "TESTS=TRUE", "STK_PROT=TRUE"], workdir, isStopped):
+        return False
+
+    # Stage the kernel so that the next group can be built while this one runs
+    shutil.rmtree(os.path.join(workdir, stageDir), ignore_errors=True)
+    shutil.copytree(os.path.join(workdir, "build"), os.path.join(workdir, stageDir))
+    return True
+
+def TestGroup(workdir, target, stageDir, testOutputFileName, isStopped):
+    start = time.time()
+    with open(testOutputFileName, "w") as outputFile:
+        p = subprocess.Popen(["make", "target={}".format(target), "BUILD_DIR={}".format(stageDir), "qemu-test-mode"], stdout = outputFile, cwd = workdir, start_new_session = True)
+        deadline = time.time() + TEST_TIMEOUT
+        try:
+            while p.poll() == None and time.time() < deadline and not isStopped():
+                try:
+                    p.wait(POLL_PERIOD)
+                except subprocess.TimeoutExpired:
+                    pass
+            if p.poll() == None:
+                KillProcessGroup(p)
+        except BaseException:
+            KillProcessGroup(p)
+            raise
+
+        outputFile.flush()
+        os.fsync(outputFile.fileno())
+    print("Tests took {:.2f}ms".format(1000 * (time.time() - start)))
+
+    jsonTestsuite = ParseInputFile(testOutputFileName)
+    if len(jsonTestsuite) != 0:
+        return Validate(jsonTestsuite) == 0
+
+    print("Error: testing result were not printed.")
+    return False
+
+class ThreadOutput:
+    """Forward writes to the buffer of the calling thread."""
+    def __init__(self):
+        self.local = threading.local()
+
+    def write(self, data):
+        return self.local.buffer.write(data)
+
+    def flush(self):
+        pass
+
+def RunShard(groups, workdir, target, testListFileName, abortEvent):
+    # Groups of a shard share the same work tree. A builder thread builds the
+    # groups in order while the current thread runs the previously built one
+    # on qemu. Each group output is captured to be printed by the main process.
+    # Groups not started when abortEvent is set are skipped. The qemu output
+    # of each group is kept next to the work tree for the main process.
+    output     = ThreadOutput()
+    builtQueue = queue.Queue(maxsize=1)
+    stopEvent  = threading.Event()
+    groupLogs  = []
+    buildError = []
+
+    def IsStopped():
+        return stopEvent.is_set() or abortEvent.is_set()
+
+    def Put(item):
+        # Give up when the tests stopped consuming the built groups
+        while not stopEvent.is_set():
+            try:
+                builtQueue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def Builder():
+        try:
+            for stageId, (index, group) in enumerate(groups):
+                if IsStopped():
+                    break
+                output.local.buffer = io.StringIO()
+                groupLogs.append(output.local.buffer)
+                stageDir = "build_stage{}".format(stageId % STAGE_COUNT)
+                isBuilt  = BuildGroup(group, workdir, target, testListFileName, stageDir, stageId == 0, IsStopped)
+                if not Put((index, isBuilt, stageDir, output.local.buffer)):
+                    return
+        except BaseException as exc:
+            buildError.append(exc)
+        finally:
+            Put(None)
+
+    results = []
+    failure = None
+    with contextlib.redirect_stdout(output):
+        builder = threading.Thread(target=Builder)
+        builder.start()
+        try:
+            for index, isBuilt, stageDir, log in iter(builtQueue.get, None):
+                if abortEvent.is_set():
+                    continue
+                output.local.buffer = log
+                outputName = os.path.join(os.path.dirname(workdir), "test_output_{}.txt".format(index))
+                isSuccess  = isBuilt and TestGroup(workdir, target, stageDir, outputName, IsStopped)
+                if abortEvent.is_set():
+                    continue
+                results.append((index, isSuccess, log.getvalue(), outputName))
+        except BaseException as exc:
+            failure = exc
+        finally:
+            stopEvent.set()
+            builder.join()
+
+    if failure == None and len(buildError) != 0:
+        failure = buildError[0]
+
+    if failure != None:
+        # Do not lose the output of the groups that led to the failure
+        sys.stdout.write("".join(log.getvalue() for log in groupLogs))
+        sys.stdout.flush()
+        raise failure
+
+    return results
+
+def CreateWorkTrees(baseDir, count):
+    # Each worker builds in its own copy of the sources so that the test list
+    # file and the build artifacts do not collide. The files on disk are
+    # copied, uncommitted changes included, without the build outputs. Only
+    # the current directory and the GRUB modules used by qemu-test-mode are
+    # needed.
+    sourceDir = os.getcwd()
+    ignore    = shutil.ignore_patterns(*BUILD_OUTPUTS)
+
+    workDirs = []
+    for i in range(count):
+        workDir = os.path.join(baseDir, "worktree{}".format(i), os.path.basename(sourceDir))
+        shutil.copytree(sourceDir, workDir, symlinks=True, ignore=ignore)
+        shutil.copytree(os.path.join(sourceDir, GRUB_MODULES_DIR), os.path.join(workDir, GRUB_MODULES_DIR), symlinks=True)
+        workDirs.append(workDir)
+
+    return workDirs
+
 if __name__ == "__main__":
-    print(COLORS.OKBLUE + COLORS.BOLD + "#==============================================================================#" + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "| roOs UNIT TEST FRAMEWORK                                                     |" + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "#==============================================================================#"  + COLORS.ENDC)
+    sys.stdout.reconfigure(line_buffering=False)
+
+    print(FRAMEWORK_BANNER)
     if len(sys.argv) != 5:
         print("Usage: {} target test_group_file test_list test_file_output".format(sys.argv[0]))
         exit(1)
@@ -182,7 +430,7 @@ if __name__ == "__main__":
     target             = sys.argv[1]
     testGroupsFileName = sys.argv[2]
     testListFileName   = sys.argv[3]
-    testOutputFileName = sys.argv[4]
+    testOutputFileName = os.path.abspath(sys.argv[4])
 
     error   = 0
     success = 0
@@ -191,60 +439,64 @@ if __name__ == "__main__":
     if target not in TARGET_LIST:
         print("Error: Unknown target {}, only {} are supported".format(target, TARGET_LIST))
 
-    with open(testGroupsFileName) as groupFile:
-        jsonObject = json.loads(groupFile.read())
-
-        for group in jsonObject:
-            print(COLORS.OKBLUE + "\n#==============================================================================#" + COLORS.ENDC)
-            print(COLORS.OKBLUE + " > Executing Group {}".format(group["name"])  + COLORS.ENDC)
-            print(COLORS.OKBLUE + " > " + str(group["testname"])  + COLORS.ENDC)
-            print(COLORS.OKBLUE + " > Target {}".format(target) + COLORS.ENDC)
-            print(COLORS.OKBLUE + "#==============================================================================#\n"  + COLORS.ENDC)
-
-            total += 1
-
-            # Update test file
-            UpdateTestFile(testListFileName, group["testname"], group["name"])
-
-            retValue = os.system("make clean TESTS=TRUE >> /dev/null")
-            if retValue != 0:
-                error += 1
-                continue
-
-            retValue = os.system("make target={} TESTS=TRUE STK_PROT=TRUE >> /dev/null".format(target, group["name"], target))
-            if retValue != 0:
-                error += 1
-                continue
-
-            start = time.time()
-            with open(testOutputFileName, "w") as outputFile:
-                p = subprocess.Popen(["make", "target={}".format(target), "qemu-test-mode"], stdout = outputFile)
+    jsonObject = LoadGroupsCached(testGroupsFileName)
+
+    # Dispatch the groups round-robin on the workers, one work tree each
+    workerCount = max(1, min(len(jsonObject), (os.cpu_count() or 1) - 2))
+    shards = [list(enumerate(jsonObject))[i::workerCount] for i in range(workerCount)]
+
+    # Copy in the try block so that a partial copy is removed on failure
+    baseDir = tempfile.mkdtemp(prefix="roos_tests_")
+    failure = None
+    try:
+        workDirs = CreateWorkTrees(baseDir, workerCount)
+        # The qemu outputs of the groups are gathered in order in the output file
+        with open(testOutputFileName, "w") as outputFile, \
+             multiprocessing.Manager() as manager, \
+             concurrent.futures.ProcessPoolExecutor(max_workers=workerCount) as executor:
+            abortEvent = manager.Event()
+            futures    = [executor.submit(RunShard, shards[i], workDirs[i], target, testListFileName, abortEvent) for i in range(workerCount)]
+            # Print the groups in order, as soon as all previous ones are done
+            pending   = {}
+            nextIndex = 0
+            for future in concurrent.futures.as_completed(futures):
                 try:
-                    p.wait(TEST_TIMEOUT)
-                except subprocess.TimeoutExpired:
-                    p.kill()
-
-                outputFile.close()
-            print("Tests took {:.2f}ms".format(1000 * (time.time() - start)))
-            os.sync()
-
-            jsonTestsuite = ParseInputFile(testOutputFileName)
-            if len(jsonTestsuite) != 0:
-                retValue = Validate(jsonTestsuite)
-                if retValue == 0:
-                    success += 1
-                else:
-                    error += 1
-            else:
-                print("Error: testing result were not printed.")
-                error += 1
-
-    print(COLORS.OKBLUE + COLORS.BOLD + "\n\n#==============================================================================#" + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "| FINAL REPORT                                                                 |" + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "#==============================================================================#"  + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "| Total:  {:<68} |".format(total)  + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "| Sucess: {:<68} |".format(success)  + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "| Errors: {:<68} |".format(error)  + COLORS.ENDC)
-    print(COLORS.OKBLUE + COLORS.BOLD + "#==============================================================================#"  + COLORS.ENDC)
+                    shardResults = future.result()
+                except BaseException as exc:
+                    # Stop the other shards, the error is raised after the report
+                    if failure == None:
+                        failure = exc
+                    abortEvent.set()
+                    for pendingFuture in futures:
+                        pendingFuture.cancel()
+                    shardResults = []
+                for index, isSuccess, log, groupOutputName in shardResults:
+                    pending[index] = (isSuccess, log, groupOutputName)
+                # After a failure some groups never come, do not wait for them
+                while len(pending) != 0 and (nextIndex in pending or failure != None):
+                    if nextIndex not in pending:
+                        nextIndex = min(pending)
+                    isSuccess, log, groupOutputName = pending.pop(nextIndex)
+                    nextIndex += 1
+                    print(log, end="")
+                    if os.path.exists(groupOutputName):
+                        with open(groupOutputName, "r", errors="ignore") as groupOutput:
+                            shutil.copyfileobj(groupOutput, outputFile)
+                    total += 1
+                    if isSuccess:
+                        success += 1
+                    else:
+                        error += 1
+    finally:
+        shutil.rmtree(baseDir, ignore_errors=True)
+
+    print(REPORT_BANNER)
+    print(BLUE_BOLD + "| Total:  {:<68} |".format(total)  + COLORS.ENDC)
+    print(BLUE_BOLD + "| Sucess: {:<68} |".format(success)  + COLORS.ENDC)
+    print(BLUE_BOLD + "| Errors: {:<68} |".format(error)  + COLORS.ENDC)
+    print(REPORT_SEPARATOR)
+
+    if failure != None:
+        raise failure
 
     exit(error)
\ No newline at end of file